@@ -24,9 +24,14 @@ def custom_processing_example():
     from genai_dashboard import DataProcessor
     
     class CustomProcessor(DataProcessor):
+        def __init__(self):
+            super().__init__()
+            # Vectorized derived column, evaluated over whole columns
+            self.register_column('revenue', 'quantity * price')
+
         def _transform_data(self, df):
             # Add custom transformations
-            df['revenue'] = df['quantity'] * df['price']
+            df['high_value'] = df['revenue'] > 1000
             return df
     
     dashboard = SalesDashboard(
@@ -0,0 +1,57 @@
+"""
+Shared AWS Clients
+~~~~~~~~~~~~~~~~
+Process-wide boto3 clients and caller identity.
+
+Client construction loads service models from disk and STS lookups cost a
+network round-trip, so both are done once and reused across managers.
+"""
+
+import functools
+import threading
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+# Connection pool sized for the concurrent Bedrock fan-out. Callers cap their
+# worker count at this size, so every request can check out a pooled
+# connection instead of opening (and then discarding) an extra one.
+MAX_POOL_CONNECTIONS = 50
+
+# Adaptive mode adds client-side rate limiting to botocore's standard retries.
+CLIENT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    retries={'mode': 'adaptive'}
+)
+
+# Bedrock calls are retried by AIEngine's own backoff loop; a single botocore
+# attempt there keeps the two from multiplying.
+SERVICE_CONFIGS = {
+    'bedrock-runtime': CLIENT_CONFIG.merge(
+        Config(retries={'mode': 'adaptive', 'total_max_attempts': 1})
+    ),
+}
+
+_session = boto3.session.Session()
+_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def get_client(service: str, region: Optional[str] = None):
+    """
+    Get a shared boto3 client for a service and region.
+    
+    Example:
+        client = get_client('quicksight', 'us-east-1')
+    """
+    # Sessions are not thread-safe; serialize client creation
+    with _lock:
+        return _session.client(
+            service, region_name=region,
+            config=SERVICE_CONFIGS.get(service, CLIENT_CONFIG)
+        )
+
+@functools.lru_cache(maxsize=None)
+def get_account_id() -> str:
+    """Get the AWS account id of the current credentials."""
+    return get_client('sts').get_caller_identity()['Account']
@@ -4,8 +4,122 @@ Amazon Bedrock Integration
 Handles AI model interactions and insight generation.
 """
 
-import boto3
-from typing import Dict, Any
+import functools
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import (
+    ClientError, ConnectionClosedError, ConnectTimeoutError,
+    EndpointConnectionError, ReadTimeoutError
+)
+from typing import Dict, Any, List, Optional, Sequence
+import pyarrow as pa
+from ._clients import MAX_POOL_CONNECTIONS, get_client
+
+try:
+    import orjson
+except ImportError:  # optional: faster request/response (de)serialization
+    orjson = None
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a request payload to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _loads(data) -> Any:
+    """Parse a JSON response payload."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _format_data(data: Any) -> str:
+    """
+    Render a data summary for a prompt as compact, key-sorted JSON.
+    
+    Uses the stdlib encoder whether or not orjson is installed, so the same
+    data always yields the same prompt (and prompt cache key).
+    """
+    try:
+        return json.dumps(data, default=str, separators=(',', ':'), sort_keys=True)
+    except TypeError:  # e.g. keys that cannot be sorted against each other
+        return str(data)
+
+# Static parts of the single-summary prompt; only the data is rendered per call
+_PROMPT_PREFIX = """Analyze this sales data and provide insights:
+        Data Summary: """
+_PROMPT_SUFFIX = """
+        Please provide:
+        1. Key trends
+        2. Anomalies
+        3. Recommendations"""
+
+# Bedrock error codes worth retrying with backoff; any 5xx response is too
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'InternalServerException',
+}
+
+# Connection-level failures worth retrying with backoff
+TRANSIENT_ERRORS = (
+    EndpointConnectionError,
+    ConnectTimeoutError,
+    ConnectionClosedError,
+    ReadTimeoutError,
+)
+
+def _is_retryable(error: ClientError) -> bool:
+    """Whether a Bedrock error response is throttling or a server-side fault."""
+    response = error.response
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+    return response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES or status >= 500
+
+# Segments per row-marshaled prompt; larger batches show diminishing returns
+MAX_BATCH_SEGMENTS = 20
+
+# Default ceiling on max_tokens for one batched request; models reject
+# requests above their output limit
+MAX_OUTPUT_TOKENS = 4096
+
+INSIGHT_KEYS = ('trends', 'anomalies', 'recommendations')
+
+def insights_to_table(
+    insights: Sequence[Dict[str, Any]],
+    segments: Optional[Sequence[str]] = None
+) -> pa.Table:
+    """
+    Flatten insight dicts into one columnar table.
+    
+    Produces one row per insight with columns ``kind`` (dictionary-encoded
+    trends/anomalies/recommendations), ``segment``, ``text`` and
+    ``confidence``, ready for vectorized filtering or Arrow-based upload.
+    
+    Example:
+        results = engine.analyze_batch(segment_data)
+        table = insights_to_table(results, segments=['NA', 'EU'])
+    """
+    kinds, names, texts = [], [], []
+    for i, item in enumerate(insights):
+        segment = segments[i] if segments is not None else None
+        for code, kind in enumerate(INSIGHT_KEYS):
+            for text in item.get(kind, []):
+                kinds.append(code)
+                names.append(segment)
+                texts.append(str(text))
+    
+    kind = pa.DictionaryArray.from_arrays(
+        pa.array(kinds, pa.int8()), pa.array(INSIGHT_KEYS, pa.string())
+    )
+    return pa.table({
+        'kind': kind,
+        'segment': pa.array(names, pa.string()),
+        'text': pa.array(texts, pa.string()),
+        'confidence': pa.nulls(len(texts), pa.float32()),
+    })
 
 class AIEngine:
     def __init__(self, config: Dict[str, Any]):
@@ -15,14 +129,27 @@ class AIEngine:
         Args:
             config: Configuration for AI model and parameters
         """
-        self.bedrock = boto3.client('bedrock-runtime')
+        self.bedrock = get_client('bedrock-runtime', config.get('region'))
+        self.logger = logging.getLogger(__name__)
         self.model_id = config.get('model_id', 'anthropic.claude-v2')
         self.temperature = config.get('temperature', 0.7)
+        self.max_tokens = config.get('max_tokens', 1000)
+        self.max_output_tokens = config.get('max_output_tokens', MAX_OUTPUT_TOKENS)
+        self.max_retries = config.get('max_retries', 3)
+        
+        # Per-engine LRU of prompt hash -> structured insights, so regenerating
+        # the same dashboard does not pay another Bedrock round-trip.
+        self._cache = functools.lru_cache(
+            maxsize=config.get('cache_size', 256)
+        )(self._invoke_raw)
 
     def analyze(self, data: Dict) -> Dict[str, Any]:
         """
         Generate insights from processed data.
         
+        Identical prompts (for the same model and sampling parameters) are
+        served from an in-memory cache instead of calling Bedrock again.
+        
         Example:
             engine = AIEngine({'model_id': 'anthropic.claude-v2'})
             insights = engine.analyze(processed_data)
@@ -30,27 +157,142 @@ class AIEngine:
         # Prepare prompt
         prompt = self._create_prompt(data)
         
-        # Get response from Bedrock
-        response = self.bedrock.invoke_model(
+        # Get structured insights, from cache when possible
+        insights = self._cache(self._cache_key(prompt), prompt)
+        
+        # Hand out copies so callers cannot mutate cached entries
+        return {key: list(items) for key, items in insights.items()}
+
+    def analyze_many(self, data_list: List[Dict], max_concurrency: int = 10) -> List[Dict[str, Any]]:
+        """
+        Generate insights for several data summaries concurrently.
+        
+        Bedrock calls are network-bound, so they are fanned out over a bounded
+        thread pool. Workers are capped at the shared client's connection
+        pool size, so no request has to open a connection the pool cannot
+        keep for reuse. Results are returned in the order of
+        ``data_list``.
+        
+        Example:
+            engine = AIEngine({'model_id': 'anthropic.claude-v2'})
+            insights = engine.analyze_many([north_summary, south_summary])
+        """
+        if not data_list:
+            return []
+        
+        workers = max(1, min(max_concurrency, len(data_list), MAX_POOL_CONNECTIONS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.analyze, data_list))
+
+    def analyze_batch(self, segments: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Generate insights for several segments with one prompt per batch.
+        
+        Segments are marshaled into a single prompt (up to MAX_BATCH_SEGMENTS
+        each) that asks for a JSON list, amortizing the prompt preamble and
+        request overhead across segments. Each request asks for
+        ``max_tokens`` per segment, capped at ``max_output_tokens``.
+        
+        Example:
+            engine = AIEngine({'model_id': 'anthropic.claude-v2'})
+            insights = engine.analyze_batch([{'region': 'NA'}, {'region': 'EU'}])
+        """
+        results = []
+        for start in range(0, len(segments), MAX_BATCH_SEGMENTS):
+            batch = segments[start:start + MAX_BATCH_SEGMENTS]
+            response = self._invoke_with_retry(
+                modelId=self.model_id,
+                body=_dumps({
+                    "prompt": self._create_batch_prompt(batch),
+                    "temperature": self.temperature,
+                    "max_tokens": min(self.max_tokens * len(batch), self.max_output_tokens)
+                })
+            )
+            results.extend(self._structure_batch_insights(response, len(batch)))
+        return results
+
+    def clear_cache(self):
+        """Drop all cached Bedrock responses."""
+        self._cache.cache_clear()
+
+    def _cache_key(self, prompt: str) -> str:
+        """Stable hash of the prompt and every parameter affecting the output."""
+        payload = f"{self.model_id}\0{self.temperature}\0{self.max_tokens}\0{prompt}"
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _invoke_raw(self, prompt_hash: str, prompt: str) -> Dict[str, Any]:
+        """Call Bedrock and structure the response (cached by prompt_hash)."""
+        response = self._invoke_with_retry(
             modelId=self.model_id,
-            body={
+            body=_dumps({
                 "prompt": prompt,
                 "temperature": self.temperature,
-                "max_tokens": 1000
-            }
+                "max_tokens": self.max_tokens
+            })
         )
         
         # Process and structure insights
         return self._structure_insights(response)
 
+    def _invoke_with_retry(self, **kwargs) -> Dict:
+        """Invoke the model, backing off exponentially on throttling, 5xx and timeouts."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.bedrock.invoke_model(
+                    contentType='application/json', accept='application/json', **kwargs
+                )
+            except (ClientError, *TRANSIENT_ERRORS) as e:
+                if isinstance(e, ClientError) and not _is_retryable(e):
+                    raise
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(min(30, 2 ** attempt))
+
     def _create_prompt(self, data: Dict) -> str:
         """Create structured prompt for the AI model."""
-        return f"""Analyze this sales data and provide insights:
-        Data Summary: {data}
-        Please provide:
-        1. Key trends
-        2. Anomalies
-        3. Recommendations"""
+        return _PROMPT_PREFIX + _format_data(data) + _PROMPT_SUFFIX
+
+    def _create_batch_prompt(self, segments: List[Dict]) -> str:
+        """Create a single row-marshaled prompt covering several segments."""
+        rows = "\n".join(
+            f"        Segment {i}: {_format_data(segment)}" for i, segment in enumerate(segments, 1)
+        )
+        return f"""For each of the following {len(segments)} sales data segments, provide insights.
+{rows}
+        Respond with only a JSON list containing one object per segment, in order,
+        each with the keys "trends", "anomalies" and "recommendations" (lists of strings)."""
+
+    def _read_completion(self, response: Dict) -> str:
+        """Extract the completion text from a Bedrock response."""
+        body = response['body']
+        payload = _loads(body.read() if hasattr(body, 'read') else body)
+        return payload.get('completion', '')
+
+    def _structure_batch_insights(self, response: Dict, count: int) -> List[Dict[str, Any]]:
+        """Parse a row-marshaled response into one insight dict per segment."""
+        results = [{key: [] for key in INSIGHT_KEYS} for _ in range(count)]
+        try:
+            text = self._read_completion(response)
+            parsed = _loads(text[text.index('['):text.rindex(']') + 1])
+        except (KeyError, ValueError, TypeError) as e:
+            self.logger.warning(f"Could not parse batch insights: {e}")
+            return results
+        
+        if not isinstance(parsed, list):
+            self.logger.warning(
+                f"Batch insights are a {type(parsed).__name__}, not a list"
+            )
+            return results
+        if len(parsed) < count:
+            self.logger.warning(
+                f"Batch insights cover {len(parsed)} of {count} segments"
+            )
+        
+        for insights, item in zip(results, parsed):
+            if isinstance(item, dict):
+                for key in INSIGHT_KEYS:
+                    insights[key] = list(item.get(key, []))
+        return results
 
     def _structure_insights(self, response: Dict) -> Dict[str, Any]:
         """Structure the AI response into useful insights."""
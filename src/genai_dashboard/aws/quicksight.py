@@ -4,9 +4,10 @@ QuickSight Dashboard Manager
 Handles creation and management of QuickSight dashboards.
 """
 
-import boto3
 from typing import Dict, Any
 import logging
+from ..config.settings import get_settings
+from ._clients import get_account_id, get_client
 
 class QuickSightManager:
     def __init__(self, region: str):
@@ -16,9 +17,16 @@ class QuickSightManager:
         Args:
             region: AWS region for QuickSight
         """
-        self.client = boto3.client('quicksight', region_name=region)
+        self.region = region
+        self.client = get_client('quicksight', region)
         self.logger = logging.getLogger(__name__)
-        self.account_id = boto3.client('sts').get_caller_identity()['Account']
+        self.account_id = get_account_id()
+        
+        template_name = get_settings()['aws']['quicksight']['template_name']
+        self._template_arn = (
+            f"arn:aws:quicksight:{region}:{self.account_id}:template/{template_name}"
+        )
+        self._root_principal = f"arn:aws:iam::{self.account_id}:root"
 
     def create_dashboard(
         self, 
@@ -47,7 +55,7 @@ class QuickSightManager:
                 DashboardId=dashboard_id,
                 Name="Sales Analytics Dashboard",
                 Permissions=[{
-                    'Principal': f'arn:aws:iam::{self.account_id}:root',
+                    'Principal': self._root_principal,
                     'Actions': ['quicksight:DescribeDashboard']
                 }],
                 SourceEntity={
@@ -79,6 +87,6 @@ class QuickSightManager:
 
     def _get_template_arn(self) -> str:
         """Get QuickSight template ARN."""
-        return f"arn:aws:quicksight:{self.region}:{self.account_id}:template/sales-template"
+        return self._template_arn
 
     
@@ -9,6 +9,9 @@ How it works
 2) Override via environment variables (12-factor friendly).
 3) Access merged/validated settings via `get_settings()`.
 
+Settings are resolved once per process; call `get_settings.cache_clear()`
+after changing the environment (e.g. in tests) to pick up new values.
+
 Environment variables (examples)
 --------------------------------
 GENAI_REGION=us-west-2
@@ -29,8 +32,14 @@ GENAI_MAX_RETRIES=3
 
 from __future__ import annotations
 
+import functools
+import importlib.util
+import logging
 import os
-from typing import Any, Dict, Literal, TypedDict
+from types import MappingProxyType
+from typing import Any, Dict, Literal, Mapping, TypedDict
+
+logger = logging.getLogger(__name__)
 
 
 # -----------------------
@@ -79,8 +88,10 @@ class RuntimeCfg(TypedDict):
     request_timeout_secs: int
     max_retries: int
 
-class LogFormatter(TypedDict):
-    format: str
+# "()" names a formatter factory for logging.config.dictConfig; other keys are its kwargs
+LogFormatter = TypedDict(
+    "LogFormatter", {"()": str, "format": str, "fmt": str}, total=False
+)
 
 class LogHandler(TypedDict):
     level: str
@@ -137,6 +148,9 @@ PRIVACY_CONFIG: PrivacyCfg = {
     "aggregation_only": True,       # export only aggregated metrics by default
 }
 
+# Salts that make anonymized tokens guessable by anyone with the source code
+WEAK_HASH_SALTS = frozenset({"", "change-me"})
+
 # Runtime toggles and network hardening
 RUNTIME_CONFIG: RuntimeCfg = {
     "enable_bedrock": True,
@@ -147,18 +161,34 @@ RUNTIME_CONFIG: RuntimeCfg = {
 }
 
 # Logging Configuration (supports 'standard' and 'json' formats)
+_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+def _json_formatter_path() -> str:
+    """Dotted path of python-json-logger's formatter, or '' if not installed."""
+    if importlib.util.find_spec("pythonjsonlogger") is None:
+        return ""
+    if importlib.util.find_spec("pythonjsonlogger.json") is not None:
+        return "pythonjsonlogger.json.JsonFormatter"  # v3+
+    return "pythonjsonlogger.jsonlogger.JsonFormatter"
+
 def _build_logging_config(fmt: Literal["standard", "json"] = "standard") -> LoggingCfg:
-    formatter = (
-        "%(asctime)s %(levelname)s %(name)s %(message)s"
-        if fmt == "standard"
-        else '{"ts":"%(asctime)s","lvl":"%(levelname)s","logger":"%(name)s","msg":"%(message)s"}'
-    )
+    formatter: LogFormatter = {"format": _LOG_FORMAT}
+    if fmt == "json":
+        json_formatter = _json_formatter_path()
+        if json_formatter:
+            # Structured formatter: fields are resolved once, and messages are
+            # JSON-escaped properly instead of interpolated into a template.
+            formatter = {"()": json_formatter, "fmt": _LOG_FORMAT}
+        else:
+            formatter = {
+                "format": '{"ts":"%(asctime)s","lvl":"%(levelname)s","logger":"%(name)s","msg":"%(message)s"}'
+            }
 
     return {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
-            "standard": {"format": formatter},
+            "standard": formatter,
         },
         "handlers": {
             "default": {
@@ -200,10 +230,31 @@ def _env_float(name: str, default: float) -> float:
         return default
 
 
-def get_settings() -> Dict[str, Any]:
+def get_privacy_settings() -> PrivacyCfg:
+    """
+    Privacy section of the settings, resolved on its own.
+    For data-processing code that should not trigger the AWS/runtime checks.
+    """
+    privacy: PrivacyCfg = {
+        "allow_pii": _env_bool("GENAI_PII_ALLOWED", PRIVACY_CONFIG["allow_pii"]),
+        "hash_salt": os.getenv("GENAI_PII_HASH_SALT", PRIVACY_CONFIG["hash_salt"]),
+        "anonymize_fields": list(PRIVACY_CONFIG["anonymize_fields"]),
+        "drop_fields": list(PRIVACY_CONFIG["drop_fields"]),
+        "aggregation_only": _env_bool("GENAI_AGGREGATION_ONLY", PRIVACY_CONFIG["aggregation_only"]),
+    }
+
+    if not privacy["allow_pii"] and privacy["hash_salt"] in WEAK_HASH_SALTS:
+        logger.warning("PII anonymized with the default GENAI_PII_HASH_SALT. Set a strong salt.")
+
+    return privacy
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Mapping[str, Any]:
     """
     Merge defaults with environment overrides and perform basic validation.
-    Returns a dict with keys: aws, processing, privacy, runtime, logging.
+    Returns a read-only mapping with keys: aws, processing, privacy, runtime, logging.
+    The result is memoized and shared; treat the nested sections as read-only too.
     """
     aws: AWSConfig = {
         "region": os.getenv("GENAI_REGION", AWS_CONFIG["region"]),
@@ -225,13 +276,7 @@ def get_settings() -> Dict[str, Any]:
 
     processing: ProcessingCfg = PROCESSING_CONFIG.copy()
 
-    privacy: PrivacyCfg = {
-        "allow_pii": _env_bool("GENAI_PII_ALLOWED", PRIVACY_CONFIG["allow_pii"]),
-        "hash_salt": os.getenv("GENAI_PII_HASH_SALT", PRIVACY_CONFIG["hash_salt"]),
-        "anonymize_fields": PRIVACY_CONFIG["anonymize_fields"],
-        "drop_fields": PRIVACY_CONFIG["drop_fields"],
-        "aggregation_only": _env_bool("GENAI_AGGREGATION_ONLY", PRIVACY_CONFIG["aggregation_only"]),
-    }
+    privacy = get_privacy_settings()
 
     runtime: RuntimeCfg = {
         "enable_bedrock": _env_bool("GENAI_ENABLE_BEDROCK", RUNTIME_CONFIG["enable_bedrock"]),
@@ -245,19 +290,16 @@ def get_settings() -> Dict[str, Any]:
 
     # --- Basic validation / guardrails ---
     if runtime["enable_quicksight"] and not aws["quicksight"]["account_id"]:
-        # In production you might raise; here we just warn via print to avoid import-time exceptions.
-        print("[WARN] QuickSight enabled but GENAI_QUICKSIGHT_ACCOUNT_ID is not set.")
-
-    if privacy["allow_pii"] and privacy["hash_salt"] in {"", "change-me"}:
-        print("[WARN] PII allowed but GENAI_PII_HASH_SALT is default. Set a strong salt.")
+        # In production you might raise; here we just warn to avoid import-time exceptions.
+        logger.warning("QuickSight enabled but GENAI_QUICKSIGHT_ACCOUNT_ID is not set.")
 
     if aws["bedrock"]["max_tokens"] <= 0:
         aws["bedrock"]["max_tokens"] = 1000
 
-    return {
+    return MappingProxyType({
         "aws": aws,
         "processing": processing,
         "privacy": privacy,
         "runtime": runtime,
         "logging": logging_cfg,
-    }
+    })
@@ -1,7 +1,17 @@
 
 """Main dashboard generation module."""
-from typing import List, Optional, Dict
+from typing import Any, Callable, List, Optional, Dict
+import hashlib
 import logging
+import os
+import pickle
+import pandas as pd
+from .processor import DataProcessor
+from ..utils.validators import expand_data_sources
+
+def _digest(payload: bytes) -> str:
+    """Short content hash used for stage cache keys."""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
 class SalesDashboard:
     """Main class for dashboard generation."""
@@ -11,7 +21,9 @@ class SalesDashboard:
         aws_region: str = "us-east-1",
         data_sources: List[str] = None,
         output_bucket: str = None,
-        ai_config: Dict = None
+        ai_config: Dict = None,
+        cache_dir: Optional[str] = None,
+        data_processor: Optional[DataProcessor] = None
     ):
         """
         Initialize dashboard generator.
@@ -21,11 +33,16 @@ class SalesDashboard:
             data_sources: List of data source patterns
             output_bucket: S3 bucket for output
             ai_config: AI model configuration
+            cache_dir: Trusted directory for caching stage outputs between
+                runs (pickled); caching is disabled when None
+            data_processor: Processor for the data sources (default DataProcessor)
         """
         self.aws_region = aws_region
         self.data_sources = data_sources or []
         self.output_bucket = output_bucket
         self.ai_config = ai_config or {}
+        self.cache_dir = cache_dir
+        self.data_processor = data_processor or DataProcessor()
         
         self._setup_logging()
         self._validate_config()
@@ -53,10 +70,15 @@ class SalesDashboard:
             self.logger.info("Starting dashboard generation")
             
             # Process data
-            processed_data = self._process_data()
+            processed_data = self._cached_stage(
+                'data', self._data_cache_key(), self._process_data
+            )
             
             # Generate insights
-            insights = self._generate_insights(processed_data)
+            insights = self._cached_stage(
+                'insights', self._insights_cache_key(processed_data),
+                self._generate_insights, processed_data
+            )
             
             # Create dashboard
             dashboard_url = self._create_dashboard(processed_data, insights)
@@ -68,11 +90,87 @@ class SalesDashboard:
             self.logger.error(f"Dashboard generation failed: {str(e)}")
             raise
 
+    def _cached_stage(self, stage: str, key: Optional[str], compute: Callable, *args) -> Any:
+        """
+        Return a stage's output from the cache, computing and storing it on a miss.
+        
+        Keys are content hashes of the stage inputs, so unchanged inputs skip
+        the stage entirely on later runs.
+        """
+        if not self.cache_dir or key is None:
+            return compute(*args)
+        
+        path = os.path.join(self.cache_dir, f"{stage}-{key}.pkl")
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            self.logger.info(f"Using cached {stage} stage output")
+            return result
+        except FileNotFoundError:
+            pass
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            # truncated entry or one pickled by incompatible code; recompute
+            self.logger.warning(f"Ignoring unreadable {stage} cache entry: {e}")
+        
+        result = compute(*args)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return result
+
+    def _data_cache_key(self) -> Optional[str]:
+        """
+        Key processed data by the source files and the processor's settings.
+        
+        Sources contribute their path, mtime and size; the processor its
+        class and clean/load/transform/privacy options and derived columns,
+        so changing any of them invalidates the cached output.
+        """
+        if any('://' in source for source in self.data_sources):
+            return None  # remote sources have no cheap change signal
+        try:
+            # the same file list DataProcessor.process will load
+            paths = expand_data_sources(self.data_sources)
+        except ValueError:
+            return None
+        stats = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            stats.append((path, st.st_mtime_ns, st.st_size))
+        
+        processor = self.data_processor
+        settings = [type(processor).__qualname__] + [
+            sorted(options.items()) for options in (
+                processor.clean_options,
+                processor.load_options,
+                processor.transform_options,
+                processor.privacy_options,
+                processor.derived_columns,
+            )
+        ]
+        return _digest(repr((stats, settings)).encode())
+
+    def _insights_cache_key(self, data) -> Optional[str]:
+        """Key insights by a fingerprint of the processed data and the model settings."""
+        model = repr(sorted(self.ai_config.items())).encode()
+        if isinstance(data, pd.DataFrame):
+            # 8 bytes per row instead of serializing the whole frame
+            schema = repr(list(zip(data.columns, map(str, data.dtypes)))).encode()
+            rows = pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()
+            return _digest(schema + rows + model)
+        return _digest(repr(data).encode() + model)
+
     def _process_data(self):
         """Process input data sources."""
         self.logger.info("Processing data sources")
-        # Implementation to be added
-        return {}
+        if not self.data_sources:
+            return {}
+        return self.data_processor.process(self.data_sources)
 
     def _generate_insights(self, data):
         """Generate AI insights from processed data."""
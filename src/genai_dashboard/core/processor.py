@@ -4,10 +4,118 @@ Data Processing Module
 Handles data cleaning, transformation, and integration.
 """
 
-from typing import List
+import ast
+import hashlib
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
 import pandas as pd
 import numpy as np
-from ..utils.validators import validate_data_source
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from ..config.settings import WEAK_HASH_SALTS, get_privacy_settings
+from ..utils.validators import expand_data_sources
+
+# Largest file _prefetch reads ahead in full
+_PREFETCH_MAX_BYTES = 256 * 1024 * 1024
+
+_DUCKDB_NUMERIC_TYPES = {
+    'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT',
+    'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE'
+}
+
+# Cell values read as missing by every CSV path (pyarrow's defaults, which
+# match pandas' default NA strings)
+_CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', 'N/A', 'NA', 'NULL', 'NaN', 'n/a', 'nan', 'null'
+]
+
+def _csv_convert_options(source: str) -> pa_csv.ConvertOptions:
+    """
+    Arrow CSV options matching pandas' parsing of the same file.
+    
+    Empty and NA-like cells become nulls in string columns too, and columns
+    Arrow would infer as dates/timestamps are kept as strings, as pandas
+    does. Temporal columns are detected from the first block only.
+    """
+    options = dict(strings_can_be_null=True, null_values=_CSV_NULL_VALUES)
+    with pa_csv.open_csv(source, convert_options=pa_csv.ConvertOptions(**options)) as reader:
+        schema = reader.schema
+    temporal = {f.name: pa.string() for f in schema if pa.types.is_temporal(f.type)}
+    return pa_csv.ConvertOptions(column_types=temporal, **options)
+
+# Parquet cache metadata key holding the signature of the source CSV
+_CACHE_SOURCE_KEY = b'genai_dashboard.source'
+
+def _source_signature(path: str) -> bytes:
+    """Size and mtime_ns of a file, for detecting changes to a cached source."""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}".encode()
+
+def _duckdb_csv_scan(source: str) -> str:
+    """
+    DuckDB ``read_csv_auto`` call matching _csv_convert_options.
+    
+    Uses the same null strings, and leaves dates and times as text, as the
+    pandas path does.
+    """
+    nulls = ', '.join(_quote_literal(value) for value in _CSV_NULL_VALUES)
+    return (
+        f"read_csv_auto({_quote_literal(source)}, nullstr=[{nulls}], "
+        "auto_type_candidates=['BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR'])"
+    )
+
+def _canonical_pii_value(value: Any) -> str:
+    """
+    Canonical text of a PII value, so tokens do not depend on the dtype.
+    
+    Integral floats (integer ids in a column with nulls) render as ints and
+    booleans as lowercase, matching DuckDB's VARCHAR casts.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return 'true' if value else 'false'
+    if isinstance(value, (float, np.floating)) and float(value).is_integer() and abs(value) < 2 ** 63:
+        return str(int(value))
+    if isinstance(value, np.integer):
+        return str(int(value))
+    return str(value)
+
+def _pii_token(value: Any, key: bytes) -> str:
+    """Keyed BLAKE2b token for a single PII value."""
+    return hashlib.blake2b(
+        _canonical_pii_value(value).encode(), key=key, digest_size=16
+    ).hexdigest()
+
+def _is_duckdb_numeric(column_type: str) -> bool:
+    """Whether a DuckDB column type is numeric."""
+    return column_type in _DUCKDB_NUMERIC_TYPES or column_type.startswith('DECIMAL')
+
+def _duckdb_canonical_text(expr: str, column_type: str) -> str:
+    """SQL rendering a column value as text the way _canonical_pii_value does."""
+    if column_type in ('FLOAT', 'DOUBLE') or column_type.startswith('DECIMAL'):
+        return (
+            f"CASE WHEN {expr} = trunc({expr}) AND abs({expr}) < 9223372036854775808 "
+            f"THEN CAST(CAST({expr} AS HUGEINT) AS VARCHAR) ELSE CAST({expr} AS VARCHAR) END"
+        )
+    return f"CAST({expr} AS VARCHAR)"
+
+def _fits(series: pd.Series, dtype: str) -> bool:
+    """Whether every value of an integer series is representable in dtype."""
+    info = np.iinfo(dtype)
+    return series.empty or (series.min() >= info.min and series.max() <= info.max)
+
+def _quote_literal(value: str) -> str:
+    """Quote a string literal (e.g. a file path) for use in DuckDB SQL."""
+    return "'" + value.replace("'", "''") + "'"
+
+def _quote_identifier(name: str) -> str:
+    """Quote a column name for use in DuckDB SQL."""
+    return '"' + name.replace('"', '""') + '"'
 
 class DataProcessor:
     def __init__(self):
@@ -17,6 +125,18 @@ class DataProcessor:
             'fill_nulls': True,
             'standardize_dates': True
         }
+        self.load_options = {
+            'cache_parquet': True,  # write a sibling .parquet on first CSV read
+            'columns': None,        # restrict loading to these columns
+            'chunksize': None       # stream CSVs in chunks of this many rows
+        }
+        self.transform_options = {
+            'downcast_integers': True,  # int64 -> int32 when values fit
+            'downcast_floats': False    # float64 -> float32, loses precision
+        }
+        self.derived_columns = {}
+        self.privacy_options = dict(get_privacy_settings())
+        self.logger = logging.getLogger(__name__)
 
     def process(self, data_sources: List[str]) -> pd.DataFrame:
         """
@@ -26,33 +146,373 @@ class DataProcessor:
             processor = DataProcessor()
             clean_data = processor.process(['sales_2024.csv'])
         """
-        # Validate sources
-        validate_data_source(data_sources)
+        # Validate sources, expanding glob patterns
+        sources = expand_data_sources(data_sources)
         
         # Load and combine data
-        combined_data = self._load_data(data_sources)
+        combined_data = self._load_data(sources)
+        
+        # Drop and tokenize PII before anything else touches it
+        combined_data = self._anonymize_data(combined_data)
         
         # Clean and transform
         processed_data = self._clean_data(combined_data)
+        processed_data = self._apply_derived_columns(processed_data)
         transformed_data = self._transform_data(processed_data)
         
-        return transformed_data
+        return self._downcast_numerics(transformed_data)
+
+    def register_column(self, name: str, expr: str) -> None:
+        """
+        Register a derived column computed from a vectorized expression.
+        
+        Expressions are evaluated with ``DataFrame.eval``, which uses numexpr
+        when it is installed, so arithmetic over whole columns stays in
+        compiled code instead of a per-row Python loop. Registered columns
+        are available to ``_transform_data`` overrides.
+        
+        For logic that cannot be written as an expression, prefer a NumPy
+        or ``numba.njit`` function over the column arrays to ``df.apply``.
+        
+        Example:
+            processor = DataProcessor()
+            processor.register_column('revenue', 'quantity * price')
+        
+        Raises:
+            ValueError: If the expression is not a single ``DataFrame.eval``
+                expression (e.g. an assignment or several lines)
+        """
+        try:
+            # A single Python expression once backtick-quoted names are
+            # replaced; eval() would accept assignments and multiple lines.
+            ast.parse(re.sub(r'`[^`]*`', '_', expr).strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression for column {name}: {e}")
+        try:
+            # Then with pandas' own parser, which supports fewer node types;
+            # unknown names are fine, columns only exist at load time.
+            pd.DataFrame().eval(expr)
+        except NameError:
+            pass
+        except Exception as e:
+            raise ValueError(f"Invalid expression for column {name}: {e}")
+        self.derived_columns[name] = expr
+
+    def _apply_derived_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Evaluate registered column expressions in registration order."""
+        for name, expr in self.derived_columns.items():
+            df = df.assign(**{name: df.eval(expr)})
+        return df
 
     def _load_data(self, sources: List[str]) -> pd.DataFrame:
-        """Load data from multiple sources."""
-        dfs = []
-        for source in sources:
-            df = pd.read_csv(source)  # Add more file type handling as needed
-            dfs.append(df)
-        return pd.concat(dfs, ignore_index=True)
+        """
+        Load data from multiple sources.
+        
+        Files are read concurrently: CSV parsing and disk IO release the GIL,
+        so a thread pool overlaps them across sources. Sources are combined as
+        Arrow tables, which concatenates without copying column data, and
+        converted to pandas once at the end. Streamed CSVs (``chunksize``)
+        arrive as DataFrames already and are concatenated in pandas instead.
+        """
+        caches = [self._fresh_parquet_cache(source) for source in sources]
+        self._prefetch([
+            cached or source for source, cached in zip(sources, caches)
+        ])
+        with ThreadPoolExecutor(max_workers=min(32, len(sources))) as executor:
+            tables = list(executor.map(self._read_source, sources, caches))
+        if any(isinstance(t, pd.DataFrame) for t in tables):
+            return pd.concat(
+                [t if isinstance(t, pd.DataFrame) else t.to_pandas() for t in tables],
+                ignore_index=True
+            )
+        try:
+            combined = pa.concat_tables(tables, promote_options='permissive')
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            # Incompatible column types across files (e.g. codes that are
+            # numeric in one file and text in another); pandas upcasts to object
+            return pd.concat([t.to_pandas() for t in tables], ignore_index=True)
+        del tables  # let self_destruct release buffers as columns convert
+        return combined.to_pandas(self_destruct=True, split_blocks=True)
+
+    def _read_source(
+        self, source: str, cached: Optional[str] = None
+    ) -> Union[pa.Table, pd.DataFrame]:
+        """
+        Read a single data source into an Arrow table.
+        
+        Parquet sources are read directly. For local CSV sources, ``cached``
+        is the up-to-date sibling ``<source>.parquet`` if there is one (see
+        _fresh_parquet_cache); otherwise the CSV is parsed and, if enabled,
+        converted to that cache for later runs. Streamed CSVs are returned
+        as the DataFrame pandas built, since their column types may differ
+        between chunks and would not convert to a single Arrow schema.
+        """
+        columns = self.load_options['columns']
+        if source.endswith('.parquet'):
+            return self._read_parquet(source, columns)
+        
+        if cached:
+            try:
+                return self._read_parquet(cached, columns)
+            except (pa.ArrowInvalid, OSError):
+                pass  # unreadable cache; treat as a miss and re-read the CSV
+        
+        if self.load_options['chunksize']:
+            return self._read_csv_chunked(source, columns)
+        
+        # Add more file type handling as needed
+        if '://' in source:
+            df = pd.read_csv(
+                source, engine="pyarrow", usecols=columns,
+                na_values=_CSV_NULL_VALUES, keep_default_na=False
+            )
+            return pa.Table.from_pandas(df, preserve_index=False)
+        
+        # stat before parsing, so a write during the read leaves the cache stale
+        signature = _source_signature(source)
+        table = pa_csv.read_csv(source, convert_options=_csv_convert_options(source))
+        if self.load_options['cache_parquet']:
+            self._write_parquet_cache(table, source + '.parquet', signature)
+        return table.select(columns) if columns else table
+
+    def _write_parquet_cache(self, table: pa.Table, path: str, signature: bytes) -> None:
+        """
+        Write the Parquet cache atomically, so readers never see a partial file.
+        
+        ``signature`` identifies the source CSV (see _source_signature) and is
+        stored in the file's key-value metadata for _fresh_parquet_cache.
+        """
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        metadata = {**(table.schema.metadata or {}), _CACHE_SOURCE_KEY: signature}
+        try:
+            pq.write_table(
+                table.replace_schema_metadata(metadata), tmp_path, compression='zstd'
+            )
+            os.replace(tmp_path, path)
+        except OSError:
+            # read-only location; the cache is best effort
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _fresh_parquet_cache(self, source: str) -> Optional[str]:
+        """
+        Path of the Parquet cache for a local CSV, if it is up to date.
+        
+        The cache is current only if the source's size and mtime_ns equal the
+        ones recorded when it was written; comparing exactly rather than
+        ordering mtimes also catches coarse timestamps and restored files.
+        """
+        cached = source + '.parquet'
+        if source.endswith('.parquet') or '://' in source or not os.path.exists(cached):
+            return None
+        try:
+            metadata = pq.read_schema(cached).metadata or {}
+            signature = _source_signature(source)
+        except (pa.ArrowInvalid, OSError):
+            return None
+        return cached if metadata.get(_CACHE_SOURCE_KEY) == signature else None
+
+    def _prefetch(self, paths: List[str]) -> None:
+        """
+        Ask the kernel to start reading every local file before parsing begins.
+        
+        One POSIX_FADV_WILLNEED hint per file queues readahead for all of them
+        up front, so later reads hit the page cache instead of blocking on
+        disk one readahead window at a time. Skipped for streamed or
+        column-pruned loads and for files above _PREFETCH_MAX_BYTES, where
+        reading whole files ahead would pull in unused bytes or evict the
+        page cache. No-op where unsupported.
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        if self.load_options['chunksize'] or self.load_options['columns']:
+            return
+        for path in paths:
+            if '://' in path:
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                if os.fstat(fd).st_size <= _PREFETCH_MAX_BYTES:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    def _read_csv_chunked(self, source: str, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Stream a large CSV in chunks, dropping duplicate rows as they arrive.
+        
+        Duplicates are detected across chunks with a sorted array of row
+        hashes, so only unique rows are ever held in memory. Null filling
+        still happens in _clean_data, since it needs means over all rows.
+        """
+        seen = np.empty(0, dtype=np.uint64)
+        chunks = []
+        reader = pd.read_csv(
+            source, chunksize=self.load_options['chunksize'], usecols=columns,
+            na_values=_CSV_NULL_VALUES, keep_default_na=False
+        )
+        for chunk in reader:
+            if self.clean_options['remove_duplicates']:
+                hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+                keep = ~pd.Series(hashes).duplicated().to_numpy()
+                if len(seen):
+                    pos = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+                    keep &= seen[pos] != hashes
+                seen = np.sort(np.concatenate([seen, hashes[keep]]))
+                chunk = chunk[keep]
+            chunks.append(chunk)
+        return pd.concat(chunks, ignore_index=True)
+
+    def _read_parquet(self, path: str, columns: List[str] = None) -> pa.Table:
+        """Read a Parquet file, pruning unused columns at the reader."""
+        return pq.read_table(path, columns=columns)
+
+    def _anonymize_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop restricted fields and replace PII fields with salted hashes.
+        
+        Each distinct value is hashed once (keyed BLAKE2b) and the tokens are
+        broadcast back through the factorized codes, so repeated identifiers
+        cost one array lookup rather than one hash call per row.
+        """
+        privacy = self.privacy_options
+        df = df.drop(columns=[c for c in privacy['drop_fields'] if c in df.columns])
+        if privacy['allow_pii']:
+            return df
+        
+        fields = [c for c in privacy['anonymize_fields'] if c in df.columns]
+        key = self._pii_key() if fields else None
+        for col in fields:
+            codes, uniques = pd.factorize(df[col])
+            if not len(uniques):
+                continue
+            tokens = np.array(
+                [_pii_token(value, key) for value in uniques], dtype=object
+            )
+            hashed = tokens[codes]
+            hashed[codes < 0] = None
+            df[col] = hashed
+        return df
+
+    def _pii_key(self) -> bytes:
+        """Hash key derived from the configured salt."""
+        salt = self.privacy_options['hash_salt']
+        if salt in WEAK_HASH_SALTS:
+            self.logger.warning(
+                "Anonymizing PII with a default or empty hash salt; "
+                "tokens can be reversed by hashing candidate values. "
+                "Set GENAI_PII_HASH_SALT."
+            )
+        return hashlib.blake2b(salt.encode(), digest_size=32).digest()
+
+    def stage_to_parquet(self, data_sources: List[str], output_path: str) -> str:
+        """
+        Clean data sources with DuckDB and write the result to Parquet.
+        
+        An out-of-core alternative to ``process`` for datasets larger than
+        memory: PII handling, deduplication and null filling run as one
+        DuckDB query that streams, parallelizes and spills to disk. Only the
+        distinct values of PII columns pass through Python, to be hashed
+        into a lookup table joined back in SQL. Transformations are not
+        applied. The Parquet output can back a QuickSight dataset or be
+        loaded with ``process``.
+        
+        Example:
+            processor = DataProcessor()
+            processor.stage_to_parquet(['sales_data_*.csv'], 'staged.parquet')
+        
+        Raises:
+            ImportError: If duckdb is not installed
+        """
+        import duckdb
+        
+        sources = expand_data_sources(data_sources)
+        con = duckdb.connect(':memory:')
+        try:
+            scans = ' UNION ALL BY NAME '.join(
+                f"SELECT * FROM read_parquet({_quote_literal(source)})"
+                if source.endswith('.parquet')
+                else f"SELECT * FROM {_duckdb_csv_scan(source)}"
+                for source in sources
+            )
+            con.execute(f"CREATE VIEW raw AS {scans}")
+            columns = {row[0]: row[1] for row in con.execute("DESCRIBE raw").fetchall()}
+            
+            con.execute(
+                f"COPY ({self._staging_query(con, columns)}) TO {_quote_literal(output_path)} "
+                "(FORMAT PARQUET, COMPRESSION ZSTD)"
+            )
+        finally:
+            con.close()
+        return output_path
+
+    def _staging_query(self, con, columns: Dict[str, str]) -> str:
+        """Build the DuckDB SQL mirroring _anonymize_data and _clean_data."""
+        privacy = self.privacy_options
+        dropped = [c for c in privacy['drop_fields'] if c in columns]
+        kept = [c for c in columns if c not in dropped]
+        anonymized = [] if privacy['allow_pii'] else [
+            c for c in kept if c in privacy['anonymize_fields']
+        ]
+        
+        select, joins = [], []
+        key = self._pii_key() if anonymized else None
+        for col in kept:
+            q = _quote_identifier(col)
+            if col not in anonymized:
+                select.append(f"r.{q}")
+                continue
+            # Hash each distinct value once in Python and join the tokens back
+            lookup = f"pii_{len(joins)}"
+            value = _duckdb_canonical_text(f"r.{q}", columns[col])
+            values = [row[0] for row in con.execute(
+                f"SELECT DISTINCT {value} FROM raw r WHERE r.{q} IS NOT NULL"
+            ).fetchall()]
+            con.register(lookup, pa.table({
+                'value': pa.array(values, pa.string()),
+                'token': pa.array([_pii_token(v, key) for v in values], pa.string()),
+            }))
+            select.append(f"{lookup}.token AS {q}")
+            joins.append(f"LEFT JOIN {lookup} ON {lookup}.value = {value}")
+        query = f"SELECT {', '.join(select)} FROM raw r {' '.join(joins)}"
+        
+        if self.clean_options['remove_duplicates']:
+            query = f"SELECT DISTINCT * FROM ({query})"
+        
+        numeric = [
+            c for c in kept
+            if c not in anonymized and _is_duckdb_numeric(columns[c])
+        ]
+        if self.clean_options['fill_nulls'] and numeric:
+            means = ', '.join(
+                f"AVG({_quote_identifier(c)}) AS {_quote_identifier(c)}" for c in numeric
+            )
+            fills = ', '.join(
+                f"COALESCE(d.{_quote_identifier(c)}, m.{_quote_identifier(c)}) AS {_quote_identifier(c)}"
+                for c in numeric
+            )
+            query = (
+                f"WITH d AS ({query}), m AS (SELECT {means} FROM d) "
+                f"SELECT d.* REPLACE ({fills}) FROM d, m"
+            )
+        return query
 
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean data by removing duplicates, handling nulls, etc."""
         if self.clean_options['remove_duplicates']:
-            df = df.drop_duplicates()
+            df = df.drop_duplicates(ignore_index=True)
         
         if self.clean_options['fill_nulls']:
-            df = df.fillna(df.mean(numeric_only=True))
+            # Means are computed once over numeric columns only; fillna with a
+            # Series then touches just those columns.
+            df = df.fillna(df.select_dtypes('number').mean())
             
         return df
 
@@ -61,4 +521,25 @@ class DataProcessor:
         # Add custom transformations here
         return df
 
+    def _downcast_numerics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Shrink numeric columns to narrower dtypes to cut memory and bandwidth.
+        
+        Integers stop at 32 bits: narrower types overflow silently in
+        ordinary arithmetic on the result (e.g. quantity * price in int8).
+        """
+        downcast = {}
+        for col in df.columns:
+            dtype = df[col].dtype
+            if not isinstance(dtype, np.dtype):
+                continue  # leave nullable/extension dtypes as they are
+            kind = dtype.kind
+            if kind in 'iu' and self.transform_options['downcast_integers']:
+                target = 'int32' if kind == 'i' else 'uint32'
+                if dtype.itemsize > 4 and _fits(df[col], target):
+                    downcast[col] = df[col].astype(target)
+            elif kind == 'f' and self.transform_options['downcast_floats']:
+                downcast[col] = pd.to_numeric(df[col], downcast='float')
+        return df.assign(**downcast) if downcast else df
+
     
@@ -4,27 +4,90 @@ Validation Utilities
 Data and configuration validation functions.
 """
 
-from typing import List, Any
+from collections import defaultdict
+from glob import glob
+from typing import Dict, List, Any
 import os
 
+_GLOB_CHARS = set('*?[')
+
 def validate_data_source(sources: List[str]) -> bool:
     """
     Validate data sources exist and are accessible.
     
     Args:
-        sources: List of data source paths
+        sources: List of data source paths or glob patterns
         
     Raises:
         ValueError: If sources are invalid
     """
+    expand_data_sources(sources)
+    return True
+
+def expand_data_sources(sources: List[str]) -> List[str]:
+    """
+    Expand glob patterns and check that every data source exists.
+    
+    Literal local paths are checked with one directory scan per parent
+    directory rather than one stat per file. A path containing glob
+    characters that exists as a file (e.g. ``sales[2024].csv``) is taken
+    literally. ``s3://`` sources are resolved with s3fs.
+    
+    Example:
+        paths = expand_data_sources(['sales_data_*.csv'])
+        
+    Raises:
+        ValueError: If no sources are given or a source matches nothing
+    """
     if not sources:
         raise ValueError("No data sources provided")
-        
+    
+    expanded: List[str] = []
+    literals: Dict[str, List[str]] = defaultdict(list)
     for source in sources:
-        if not os.path.exists(source):
-            raise ValueError(f"Data source not found: {source}")
-            
-    return True
+        if source.startswith('s3://'):
+            expanded.extend(_expand_s3_source(source))
+        elif _GLOB_CHARS & set(source) and not os.path.exists(source):
+            matches = sorted(glob(source))
+            if not matches:
+                raise ValueError(f"Data source not found: {source}")
+            # Skip Parquet caches written next to CSVs that also matched
+            found = set(matches)
+            expanded.extend(
+                m for m in matches
+                if not (m.endswith('.parquet') and m[:-len('.parquet')] in found)
+            )
+        else:
+            literals[os.path.dirname(source)].append(source)
+            expanded.append(source)
+    
+    for directory, paths in literals.items():
+        try:
+            with os.scandir(directory or '.') as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            names = set()
+        for path in paths:
+            if os.path.basename(path) not in names:
+                raise ValueError(f"Data source not found: {path}")
+    
+    return expanded
+
+def _expand_s3_source(source: str) -> List[str]:
+    """Resolve an S3 URI or pattern to the matching object URIs."""
+    try:
+        import s3fs
+    except ImportError:
+        raise ValueError(f"s3fs is required for S3 data sources: {source}")
+    
+    fs = s3fs.S3FileSystem()
+    if _GLOB_CHARS & set(source):
+        matches = [f"s3://{path}" for path in sorted(fs.glob(source))]
+    else:
+        matches = [source] if fs.exists(source) else []
+    if not matches:
+        raise ValueError(f"Data source not found: {source}")
+    return matches
 
 def validate_aws_config(config: dict) -> bool:
     """
@@ -0,0 +1,131 @@
+"""
+Test Suite for Bedrock Integration
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for AI engine functionality.
+"""
+
+import io
+import json
+import pytest
+from botocore.exceptions import ClientError, ConnectionClosedError
+from unittest.mock import patch
+from genai_dashboard.aws.bedrock import AIEngine, insights_to_table
+
+@pytest.fixture
+def engine():
+    """Create test engine instance with a mocked Bedrock client."""
+    with patch('genai_dashboard.aws.bedrock.get_client'):
+        yield AIEngine({'model_id': 'anthropic.claude-v2'})
+
+def test_analyze_caches_identical_prompts(engine):
+    """Test repeated analysis of the same data hits Bedrock once."""
+    data = {'sales': 1000, 'region': 'NA'}
+    
+    first = engine.analyze(data)
+    second = engine.analyze(data)
+    
+    assert first == second
+    engine.bedrock.invoke_model.assert_called_once()
+
+def test_analyze_cache_keyed_by_parameters(engine):
+    """Test changing sampling parameters bypasses the cache."""
+    data = {'sales': 1000}
+    
+    engine.analyze(data)
+    engine.temperature = 0.2
+    engine.analyze(data)
+    
+    assert engine.bedrock.invoke_model.call_count == 2
+
+def test_analyze_many_preserves_order(engine):
+    """Test batch analysis returns one result per input."""
+    results = engine.analyze_many([{'region': 'NA'}, {'region': 'EU'}], max_concurrency=2)
+    
+    assert len(results) == 2
+    assert engine.bedrock.invoke_model.call_count == 2
+
+@patch('genai_dashboard.aws.bedrock.time.sleep')
+def test_invoke_retries_throttling(mock_sleep, engine):
+    """Test throttled calls are retried with backoff."""
+    throttled = ClientError({'Error': {'Code': 'ThrottlingException'}}, 'InvokeModel')
+    engine.bedrock.invoke_model.side_effect = [throttled, {}]
+    
+    engine.analyze({'sales': 1000})
+    
+    assert engine.bedrock.invoke_model.call_count == 2
+    mock_sleep.assert_called_once_with(1)
+
+@patch('genai_dashboard.aws.bedrock.time.sleep')
+def test_invoke_retries_server_errors(mock_sleep, engine):
+    """Test 5xx responses and dropped connections are retried."""
+    server_error = ClientError(
+        {'Error': {'Code': 'InternalFailure'}, 'ResponseMetadata': {'HTTPStatusCode': 502}},
+        'InvokeModel'
+    )
+    engine.bedrock.invoke_model.side_effect = [
+        server_error, ConnectionClosedError(endpoint_url='https://bedrock'), {}
+    ]
+    
+    engine.analyze({'sales': 1000})
+    
+    assert engine.bedrock.invoke_model.call_count == 3
+
+def test_analyze_batch_single_request(engine):
+    """Test segments are marshaled into one request and parsed in order."""
+    completion = json.dumps([
+        {'trends': ['NA up'], 'anomalies': [], 'recommendations': []},
+        {'trends': ['EU flat'], 'anomalies': ['spike'], 'recommendations': []}
+    ])
+    engine.bedrock.invoke_model.return_value = {
+        'body': io.BytesIO(json.dumps({'completion': completion}).encode())
+    }
+    
+    results = engine.analyze_batch([{'region': 'NA'}, {'region': 'EU'}])
+    
+    engine.bedrock.invoke_model.assert_called_once()
+    assert results[0]['trends'] == ['NA up']
+    assert results[1]['anomalies'] == ['spike']
+
+def test_analyze_batch_caps_tokens_and_warns_on_short_response(engine, caplog):
+    """Test batched max_tokens is capped and missing segments are logged."""
+    engine.max_output_tokens = 1500
+    completion = json.dumps([{'trends': ['NA up']}])
+    engine.bedrock.invoke_model.return_value = {
+        'body': io.BytesIO(json.dumps({'completion': completion}).encode())
+    }
+    
+    results = engine.analyze_batch([{'region': 'NA'}, {'region': 'EU'}])
+    
+    body = json.loads(engine.bedrock.invoke_model.call_args.kwargs['body'])
+    assert body['max_tokens'] == 1500
+    assert results[1]['trends'] == []
+    assert "cover 1 of 2 segments" in caplog.text
+
+def test_insights_to_table():
+    """Test insights flatten into one row per item."""
+    insights = [
+        {'trends': ['NA up'], 'anomalies': [], 'recommendations': ['hire']},
+        {'trends': [], 'anomalies': ['spike'], 'recommendations': []}
+    ]
+    
+    table = insights_to_table(insights, segments=['NA', 'EU'])
+    
+    assert table.num_rows == 3
+    assert table.column('kind').to_pylist() == ['trends', 'recommendations', 'anomalies']
+    assert table.column('segment').to_pylist() == ['NA', 'NA', 'EU']
+
+def test_invoke_sends_json_body(engine):
+    """Test request payloads are serialized to JSON bytes."""
+    engine.analyze({'sales': 1000})
+    
+    kwargs = engine.bedrock.invoke_model.call_args.kwargs
+    assert json.loads(kwargs['body'])['max_tokens'] == 1000
+    assert kwargs['contentType'] == 'application/json'
+
+def test_create_prompt_renders_data(engine):
+    """Test the prompt embeds the data summary as JSON."""
+    prompt = engine._create_prompt({'sales': 1000, 'region': 'NA'})
+    
+    assert prompt.startswith("Analyze this sales data and provide insights:")
+    assert 'Data Summary: {"region":"NA","sales":1000}\n' in prompt
+    assert prompt.endswith("3. Recommendations")
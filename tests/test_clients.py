@@ -0,0 +1,40 @@
+"""
+Test Suite for Shared AWS Clients
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for client and identity reuse.
+"""
+
+from unittest.mock import patch
+from genai_dashboard.aws import _clients
+
+def test_get_client_reused():
+    """Test clients are built once per service and region."""
+    first = _clients.get_client('bedrock-runtime', 'us-east-1')
+    second = _clients.get_client('bedrock-runtime', 'us-east-1')
+    
+    assert first is second
+    assert _clients.get_client('bedrock-runtime', 'us-west-2') is not first
+
+@patch('genai_dashboard.aws._clients.get_client')
+def test_get_account_id_cached(mock_get_client):
+    """Test the STS identity lookup happens once."""
+    mock_get_client.return_value.get_caller_identity.return_value = {'Account': '123456789012'}
+    _clients.get_account_id.cache_clear()
+    
+    assert _clients.get_account_id() == '123456789012'
+    assert _clients.get_account_id() == '123456789012'
+    mock_get_client.return_value.get_caller_identity.assert_called_once()
+    _clients.get_account_id.cache_clear()
+
+def test_bedrock_client_does_not_retry():
+    """Test botocore makes a single Bedrock attempt, leaving retries to AIEngine."""
+    client = _clients.get_client('bedrock-runtime', 'us-east-1')
+    
+    assert client.meta.config.retries['total_max_attempts'] == 1
+
+def test_other_clients_keep_retries():
+    """Test clients without their own backoff keep botocore's retries."""
+    client = _clients.get_client('sts', 'us-east-1')
+    
+    assert client.meta.config.retries['mode'] == 'adaptive'
+    assert 'total_max_attempts' not in client.meta.config.retries
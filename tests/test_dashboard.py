@@ -34,3 +34,63 @@ def test_dashboard_generation(mock_quicksight, dashboard):
     
     assert result == "dashboard-123"
     mock_quicksight.return_value.create_dashboard.assert_called_once()
+
+def test_stage_cache_skips_unchanged_inputs(tmp_path):
+    """Test stage outputs are reused when inputs have not changed."""
+    source = tmp_path / "sales.csv"
+    source.write_text("date,sales\n2024-01-01,1000\n")
+    dashboard = SalesDashboard(
+        data_sources=[str(source)],
+        cache_dir=str(tmp_path / "cache")
+    )
+    
+    with patch.object(SalesDashboard, '_process_data', return_value={'rows': 1}) as mock_process:
+        dashboard.generate()
+        dashboard.generate()
+    
+    mock_process.assert_called_once()
+
+def test_stage_cache_keyed_by_processor_options(tmp_path):
+    """Test changing processing options invalidates cached data."""
+    source = tmp_path / "sales.csv"
+    source.write_text("date,sales\n2024-01-01,1000\n")
+    dashboard = SalesDashboard(data_sources=[str(source)])
+    
+    key = dashboard._data_cache_key()
+    dashboard.data_processor.clean_options['fill_nulls'] = False
+    assert dashboard._data_cache_key() != key
+    
+    key = dashboard._data_cache_key()
+    dashboard.data_processor.privacy_options['hash_salt'] = 'rotated'
+    assert dashboard._data_cache_key() != key
+
+def test_process_data_uses_data_processor(tmp_path):
+    """Test the configured processor handles the data sources."""
+    processor = Mock()
+    dashboard = SalesDashboard(data_sources=["sales.csv"], data_processor=processor)
+    
+    assert dashboard._process_data() is processor.process.return_value
+    processor.process.assert_called_once_with(["sales.csv"])
+
+def test_stage_cache_ignores_unreadable_entries(tmp_path):
+    """Test a corrupt cache entry is recomputed rather than raised."""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    dashboard = SalesDashboard(cache_dir=str(cache_dir))
+    (cache_dir / "data-abc.pkl").write_bytes(b"\x80\x05trunc")
+    
+    result = dashboard._cached_stage('data', 'abc', lambda: {'rows': 1})
+    
+    assert result == {'rows': 1}
+    assert dashboard._cached_stage('data', 'abc', lambda: None) == {'rows': 1}
+
+def test_data_cache_key_skips_parquet_caches(tmp_path):
+    """Test a Parquet cache written next to a CSV does not change the key."""
+    source = tmp_path / "sales.csv"
+    source.write_text("date,sales\n2024-01-01,1000\n")
+    dashboard = SalesDashboard(data_sources=[str(tmp_path / "*.csv*")])
+    
+    key = dashboard._data_cache_key()
+    (tmp_path / "sales.csv.parquet").write_bytes(b"cache")
+    
+    assert dashboard._data_cache_key() == key
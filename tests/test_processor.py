@@ -4,8 +4,10 @@ Test Suite for Data Processor
 Unit tests for data processing functionality.
 """
 
+import os
 import pytest
 import pandas as pd
+from unittest.mock import patch
 from genai_dashboard import DataProcessor
 
 @pytest.fixture
@@ -32,3 +34,326 @@ def test_data_cleaning(processor, sample_data):
     
     assert len(clean_data) == len(sample_data)
     assert not clean_data.duplicated().any()
+
+def test_load_multiple_sources(processor, sample_data, tmp_path):
+    """Test loading and combining several CSV sources."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"sales_data_{i}.csv"
+        sample_data.to_csv(path, index=False)
+        paths.append(str(path))
+    
+    combined = processor._load_data(paths)
+    
+    assert len(combined) == 3 * len(sample_data)
+    assert list(combined.columns) == list(sample_data.columns)
+
+def test_load_uses_parquet_cache(processor, sample_data, tmp_path):
+    """Test CSV sources are cached as Parquet and reused."""
+    path = tmp_path / "sales_data.csv"
+    sample_data.to_csv(path, index=False)
+    
+    first = processor._load_data([str(path)])
+    assert (tmp_path / "sales_data.csv.parquet").exists()
+    
+    processor.load_options['columns'] = ['sales']
+    second = processor._load_data([str(path)])
+    
+    assert list(second.columns) == ['sales']
+    assert second['sales'].tolist() == first['sales'].tolist()
+
+def test_parquet_cache_invalidated_by_older_source(processor, sample_data, tmp_path):
+    """Test a source replaced by an older file is re-read, not served from cache."""
+    path = tmp_path / "sales_data.csv"
+    sample_data.to_csv(path, index=False)
+    processor._load_data([str(path)])
+    
+    sample_data.assign(sales=[1, 2]).to_csv(path, index=False)
+    os.utime(path, ns=(0, 0))
+    
+    assert processor._load_data([str(path)])['sales'].tolist() == [1, 2]
+
+def test_fill_nulls_with_column_means(processor):
+    """Test numeric nulls are filled with column means."""
+    data = pd.DataFrame({
+        'sales': [1000.0, None, 3000.0],
+        'region': ['NA', 'EU', 'NA']
+    })
+    
+    clean_data = processor._clean_data(data)
+    
+    assert clean_data['sales'].tolist() == [1000.0, 2000.0, 3000.0]
+    assert clean_data['region'].tolist() == ['NA', 'EU', 'NA']
+
+def test_process_expands_glob_sources(processor, sample_data, tmp_path):
+    """Test glob patterns are expanded to matching files."""
+    for i in range(2):
+        sample_data.assign(sales=sample_data['sales'] + i).to_csv(
+            tmp_path / f"sales_data_{i}.csv", index=False
+        )
+    
+    result = processor.process([str(tmp_path / "sales_data_*.csv")])
+    
+    assert len(result) == 2 * len(sample_data)
+
+def test_process_missing_source(processor, tmp_path):
+    """Test missing sources are rejected."""
+    with pytest.raises(ValueError, match="Data source not found"):
+        processor.process([str(tmp_path / "missing.csv")])
+
+def test_process_literal_path_with_glob_characters(processor, sample_data, tmp_path):
+    """Test a file whose name contains glob characters is loaded as-is."""
+    path = tmp_path / "sales[2024].csv"
+    sample_data.to_csv(path, index=False)
+    
+    result = processor.process([str(path)])
+    
+    assert len(result) == len(sample_data)
+
+def test_load_chunked_deduplicates_across_chunks(processor, sample_data, tmp_path):
+    """Test chunked CSV reads drop duplicates spanning chunk boundaries."""
+    path = tmp_path / "sales_data.csv"
+    pd.concat([sample_data] * 3).to_csv(path, index=False)
+    processor.load_options['chunksize'] = 2
+    
+    combined = processor._load_data([str(path)])
+    
+    assert len(combined) == len(sample_data)
+    assert not (tmp_path / "sales_data.csv.parquet").exists()
+
+def test_load_chunked_mixed_dtypes_across_chunks(processor, tmp_path):
+    """Test chunked reads survive a column whose type changes between chunks."""
+    path = tmp_path / "sales_data.csv"
+    codes = [str(i) for i in range(1, 900)] + ['A12']
+    pd.DataFrame({'code': codes}).to_csv(path, index=False)
+    processor.load_options['chunksize'] = 100
+    
+    combined = processor._load_data([str(path)])
+    
+    assert len(combined) == 900
+    assert combined['code'].iloc[-1] == 'A12'
+
+def test_register_column(processor):
+    """Test registered expressions become derived columns."""
+    data = pd.DataFrame({'quantity': [2, 3], 'price': [10.0, 20.0]})
+    processor.register_column('revenue', 'quantity * price')
+    
+    result = processor._apply_derived_columns(data)
+    
+    assert result['revenue'].tolist() == [20.0, 60.0]
+    with pytest.raises(ValueError):
+        processor.register_column('bad', 'quantity *')
+
+def test_register_column_rejects_non_expressions(processor):
+    """Test unsupported expressions are rejected with ValueError at registration."""
+    for expr in ['lambda: 1', 'a = b + c', 'a\nb', 'x if y else z']:
+        with pytest.raises(ValueError):
+            processor.register_column('bad', expr)
+    
+    assert 'bad' not in processor.derived_columns
+
+def test_register_column_backtick_names(processor):
+    """Test backtick-quoted column names are accepted."""
+    data = pd.DataFrame({'unit price': [2.0, 3.0]})
+    processor.register_column('double', '`unit price` * 2')
+    
+    assert processor._apply_derived_columns(data)['double'].tolist() == [4.0, 6.0]
+
+def test_anonymize_pii_fields(processor):
+    """Test PII fields are tokenized and restricted fields dropped."""
+    data = pd.DataFrame({
+        'email': ['a@example.com', 'b@example.com', 'a@example.com', None],
+        'ssn': ['1', '2', '3', '4'],
+        'sales': [1, 2, 3, 4]
+    })
+    
+    result = processor._anonymize_data(data)
+    
+    assert 'ssn' not in result.columns
+    assert result['email'][0] == result['email'][2]
+    assert result['email'][0] != result['email'][1]
+    assert 'a@example.com' not in result['email'].tolist()
+    assert pd.isna(result['email'][3])
+
+def test_downcast_numerics(processor, sample_data):
+    """Test integer columns shrink to int32 and floats are kept unless enabled."""
+    data = sample_data.assign(price=[9.5, 10.25], big=[0, 2 ** 40])
+    
+    result = processor._downcast_numerics(data)
+    assert result['sales'].dtype == 'int32'
+    assert result['big'].dtype == 'int64'
+    assert result['price'].dtype == 'float64'
+    assert (result['sales'] * 100000).tolist() == [100000000, 200000000]
+    
+    processor.transform_options['downcast_floats'] = True
+    assert processor._downcast_numerics(data)['price'].dtype == 'float32'
+
+def test_stage_to_parquet_matches_pandas_cleaning(processor, tmp_path):
+    """Test DuckDB staging deduplicates, fills nulls and tokenizes PII."""
+    pytest.importorskip("duckdb")
+    data = pd.DataFrame({
+        'email': ['a@example.com', 'a@example.com', 'b@example.com'],
+        'sales': [1000.0, 1000.0, None],
+        'ssn': ['1', '1', '2']
+    })
+    source = tmp_path / "sales_data.csv"
+    data.to_csv(source, index=False)
+    output = tmp_path / "staged.parquet"
+    
+    processor.stage_to_parquet([str(source)], str(output))
+    staged = pd.read_parquet(output).sort_values('email', ignore_index=True)
+    expected = processor._clean_data(processor._anonymize_data(data))
+    expected = expected.sort_values('email', ignore_index=True)
+    
+    assert list(staged.columns) == ['email', 'sales']
+    assert staged['email'].tolist() == expected['email'].astype(str).tolist()
+    assert staged['sales'].tolist() == [1000.0, 1000.0]
+
+def test_load_sources_with_different_types(processor, tmp_path):
+    """Test files whose columns infer to different types still combine."""
+    (tmp_path / "sales_a.csv").write_text("code,date,email\nA1,2024-01-01,a@example.com\n")
+    (tmp_path / "sales_b.csv").write_text("code,date,email\n17,2024-01-02,\n")
+    
+    combined = processor._load_data([str(tmp_path / "sales_a.csv"), str(tmp_path / "sales_b.csv")])
+    
+    assert combined['code'].tolist() == ['A1', 17]
+    assert combined['date'].tolist() == ['2024-01-01', '2024-01-02']
+    assert pd.isna(combined['email'][1])
+
+def test_load_chunked_with_cached_sources(processor, tmp_path):
+    """Test chunked and Parquet-cached CSVs combine in one load."""
+    cached = tmp_path / "sales_a.csv"
+    cached.write_text("date,sales,email\n2024-01-01,1000,a@example.com\n")
+    processor._load_data([str(cached)])  # writes the Parquet cache
+    uncached = tmp_path / "sales_b.csv"
+    uncached.write_text("date,sales,email\n2024-01-02,,\n")
+    processor.load_options['chunksize'] = 1
+    
+    combined = processor._load_data([str(cached), str(uncached)])
+    
+    assert combined['date'].tolist() == ['2024-01-01', '2024-01-02']
+    assert pd.isna(combined['sales'][1])
+    assert pd.isna(combined['email'][1])
+
+def test_anonymize_warns_on_default_salt(processor, caplog):
+    """Test anonymizing with the default or an empty salt logs a warning."""
+    data = pd.DataFrame({'email': ['a@example.com']})
+    for salt in ('change-me', ''):
+        processor.privacy_options['hash_salt'] = salt
+        caplog.clear()
+        
+        processor._anonymize_data(data)
+        
+        assert "hash salt" in caplog.text
+    
+    processor.privacy_options['hash_salt'] = 'strong-salt'
+    caplog.clear()
+    processor._anonymize_data(data)
+    assert "hash salt" not in caplog.text
+
+def test_anonymize_numeric_ids_independent_of_nulls(processor):
+    """Test an id gets the same token whether or not its column has nulls."""
+    with_nulls = processor._anonymize_data(pd.DataFrame({'user_id': [1, None]}))
+    without_nulls = processor._anonymize_data(pd.DataFrame({'user_id': [1, 2]}))
+    
+    assert with_nulls['user_id'][0] == without_nulls['user_id'][0]
+
+def test_stage_to_parquet_integer_pii_matches_pandas(processor, tmp_path):
+    """Test integer PII ids with nulls stage and tokenize like pandas."""
+    pytest.importorskip("duckdb")
+    source = tmp_path / "sales_data.csv"
+    source.write_text("user_id,sales\n1,100\n,200\n2,300\n")
+    output = tmp_path / "staged.parquet"
+    
+    processor.stage_to_parquet([str(source)], str(output))
+    staged = pd.read_parquet(output).sort_values('sales', ignore_index=True)
+    expected = processor._anonymize_data(processor._load_data([str(source)]))
+    
+    assert staged['user_id'][0] == expected['user_id'][0]
+    assert staged['user_id'][2] == expected['user_id'][2]
+    assert pd.isna(staged['user_id'][1])
+
+def test_stage_to_parquet_csv_parsing_matches_pandas(processor, tmp_path):
+    """Test DuckDB reads null strings and dates like the pandas path."""
+    pytest.importorskip("duckdb")
+    source = tmp_path / "sales_data.csv"
+    source.write_text("region,date,sales\nNA,2024-01-01,100\nEU,2024-01-02,n/a\n")
+    output = tmp_path / "staged.parquet"
+    processor.load_options['cache_parquet'] = False
+    
+    processor.stage_to_parquet([str(source)], str(output))
+    staged = pd.read_parquet(output).sort_values('date', ignore_index=True)
+    expected = processor._clean_data(processor._load_data([str(source)]))
+    
+    assert pd.isna(staged['region'][0]) and pd.isna(expected['region'][0])
+    assert staged['date'].tolist() == expected['date'].tolist()
+    assert staged['sales'].tolist() == expected['sales'].tolist()
+
+def test_clean_data_keeps_string_dtypes(processor, sample_data):
+    """Test cleaning does not leak categorical dtypes to transforms."""
+    data = pd.concat([sample_data] * 4, ignore_index=True)
+    
+    clean_data = processor._clean_data(data)
+    clean_data.loc[clean_data.region == 'EU', 'region'] = 'Europe'
+    
+    assert clean_data['region'].dtype == data['region'].dtype
+    assert clean_data['region'].tolist() == ['NA', 'Europe']
+
+def test_load_ignores_corrupt_parquet_cache(processor, sample_data, tmp_path):
+    """Test an unreadable Parquet cache falls back to the CSV."""
+    path = tmp_path / "sales_data.csv"
+    sample_data.to_csv(path, index=False)
+    (tmp_path / "sales_data.csv.parquet").write_bytes(b"truncated")
+    
+    loaded = processor._load_data([str(path)])
+    
+    assert loaded['sales'].tolist() == sample_data['sales'].tolist()
+    assert processor._load_data([str(path)])['sales'].tolist() == sample_data['sales'].tolist()
+
+def test_prefetch_hints_small_local_files(processor, sample_data, tmp_path):
+    """Test prefetch hints readable files and skips missing ones."""
+    path = tmp_path / "sales_data.csv"
+    sample_data.to_csv(path, index=False)
+    
+    with patch('os.posix_fadvise', create=True) as mock_fadvise:
+        processor._prefetch([str(path), str(tmp_path / "missing.csv")])
+    
+    mock_fadvise.assert_called_once()
+
+def test_prefetch_skipped_for_streamed_or_pruned_loads(processor, sample_data, tmp_path):
+    """Test no readahead is requested when only part of a file is needed."""
+    path = tmp_path / "sales_data.csv"
+    sample_data.to_csv(path, index=False)
+    
+    with patch('os.posix_fadvise', create=True) as mock_fadvise:
+        processor.load_options['chunksize'] = 1000
+        processor._prefetch([str(path)])
+        processor.load_options['chunksize'] = None
+        processor.load_options['columns'] = ['sales']
+        processor._prefetch([str(path)])
+    
+    mock_fadvise.assert_not_called()
+
+def test_prefetch_noop_without_fadvise(processor, sample_data, tmp_path, monkeypatch):
+    """Test loading works where posix_fadvise is unavailable."""
+    path = tmp_path / "sales_data.csv"
+    sample_data.to_csv(path, index=False)
+    monkeypatch.delattr('os.posix_fadvise', raising=False)
+    
+    assert len(processor._load_data([str(path)])) == len(sample_data)
+
+def test_processor_init_is_quiet(capsys):
+    """Test constructing a processor prints no configuration warnings."""
+    DataProcessor()
+    
+    assert capsys.readouterr().out == ""
+
+def test_register_column_backtick_names(processor):
+    """Test expressions using backtick-quoted column names are accepted."""
+    data = pd.DataFrame({'unit price': [2.0, 3.0], 'q': [5, 5]})
+    processor.register_column('revenue', '`unit price` * q')
+    
+    result = processor._apply_derived_columns(data)
+    
+    assert result['revenue'].tolist() == [10.0, 15.0]
+    assert 'revenue' not in data.columns
@@ -0,0 +1,18 @@
+"""
+Test Suite for QuickSight Manager
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for dashboard management functionality.
+"""
+
+from unittest.mock import patch
+from genai_dashboard.aws.quicksight import QuickSightManager
+
+@patch('genai_dashboard.aws.quicksight.get_account_id', return_value='123456789012')
+@patch('genai_dashboard.aws.quicksight.get_client')
+def test_template_arn(mock_get_client, mock_get_account_id):
+    """Test the template ARN uses the manager's region and account."""
+    manager = QuickSightManager('us-west-2')
+    
+    assert manager._get_template_arn() == (
+        "arn:aws:quicksight:us-west-2:123456789012:template/sales-template"
+    )
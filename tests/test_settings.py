@@ -0,0 +1,29 @@
+"""
+Test Suite for Configuration Settings
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Unit tests for settings resolution.
+"""
+
+import pytest
+from genai_dashboard.config.settings import get_settings
+
+@pytest.fixture(autouse=True)
+def fresh_settings():
+    """Resolve settings from the current environment for each test."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+def test_settings_env_override(monkeypatch):
+    """Test environment variables override defaults."""
+    monkeypatch.setenv("GENAI_BEDROCK_MAX_TOKENS", "800")
+    
+    assert get_settings()["aws"]["bedrock"]["max_tokens"] == 800
+
+def test_settings_memoized_and_read_only():
+    """Test settings are resolved once and cannot be reassigned."""
+    settings = get_settings()
+    
+    assert get_settings() is settings
+    with pytest.raises(TypeError):
+        settings["aws"] = {}